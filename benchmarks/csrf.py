@@ -0,0 +1,76 @@
+"""
+Cost of CSRF token issuance and validation.
+
+Issuance is measured for a fresh session (new token, session and cookie
+writes) and for a session that already holds a valid token (reuse, no
+writes). Validation is measured for a header-submitted token and for one
+read from a JSON body.
+
+    python benchmarks/csrf.py [--number 50000]
+"""
+import os
+import sys
+import json
+import timeit
+import argparse
+
+# Allow running as ``python benchmarks/<script>.py`` from a source checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Request, Response
+from fastapi_hooks.security.use_csrf import CSRF_HEADER, CSRF_TOKEN_KEY, get_csrf_token, validate_csrf_token
+
+
+def make_request(session: dict, headers=(), body: bytes = b"") -> Request:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+        "session": session,
+    }, receive)
+
+
+def drive(coroutine):
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended; it cannot be driven synchronously")
+
+
+def per_call_us(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    session = {}
+    token = get_csrf_token(make_request(session), Response())["csrf_token"]
+    cookie = ("cookie", f"{CSRF_TOKEN_KEY}={token}")
+
+    reuse_request = make_request(session, [cookie])
+    header_request = make_request(session, [(CSRF_HEADER, token)])
+    json_body = json.dumps({CSRF_TOKEN_KEY: token}).encode()
+
+    results = {
+        "issue (new session)": lambda: get_csrf_token(make_request({}), Response()),
+        "issue (reuse token)": lambda: get_csrf_token(reuse_request, Response()),
+        "validate (header)": lambda: drive(validate_csrf_token(header_request, token)),
+        "validate (json body)": lambda: drive(validate_csrf_token(
+            make_request(session, [("content-type", "application/json")], json_body), token
+        )),
+    }
+
+    for name, func in results.items():
+        print(f"{name:<22} {per_call_us(func, args.number):8.2f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+End-to-end latency of routes behind each auth hook, sync vs async handlers.
+
+Requests go through FastAPI's TestClient, so the numbers include request
+parsing, dependency injection and, for sync handlers, the threadpool hop
+that hook_overhead.py leaves out. The database is in-memory SQLite and
+bcrypt runs at its minimum cost, so hashing does not drown out the rest.
+
+    python benchmarks/hook_endpoints.py [--number 200]
+"""
+import os
+import sys
+import time
+import argparse
+import itertools
+
+# Allow running as ``python benchmarks/<script>.py`` from a source checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Depends, Request, Response
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy import create_engine, Column, Integer, String
+from sqlalchemy.orm import declarative_base, sessionmaker, Session
+from sqlalchemy.pool import StaticPool
+from starlette.middleware.sessions import SessionMiddleware
+from fastapi_hooks.auth.password_context import get_pwd_context
+from fastapi_hooks.auth.use_login import use_login
+from fastapi_hooks.auth.use_logout import use_logout
+from fastapi_hooks.auth.use_register import use_register
+from fastapi_hooks.auth.use_password_reset import use_password_reset
+from fastapi_hooks.security.use_csrf import CSRF_HEADER, use_csrf, get_csrf_token
+from fastapi_hooks.security.use_admission_control import use_admission_control
+
+# use_login signs tokens with this key
+SECRET = "1234"
+EMAIL = "bench@example.com"
+PASSWORD = "benchmark-password"
+
+Base = declarative_base()
+
+
+class User(Base):
+    __tablename__ = "users"
+    id = Column(Integer, primary_key=True)
+    email = Column(String, unique=True, index=True)
+    hashed_password = Column(String)
+
+
+class Credentials(BaseModel):
+    email: str
+    password: str
+
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+SessionLocal = sessionmaker(bind=engine)
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(SessionMiddleware, secret_key=SECRET)
+
+    @app.get("/csrf")
+    def csrf(request: Request, response: Response):
+        return get_csrf_token(request, response)
+
+    @app.post("/bare/sync")
+    def bare_sync(request: Request):
+        return {"ok": True}
+
+    @app.post("/bare/async")
+    async def bare_async(request: Request):
+        return {"ok": True}
+
+    @app.post("/use_login/sync")
+    @use_login(Credentials, User, "email")
+    def login_sync(data: Credentials, request: Request, response: Response, db: Session = Depends(get_db), token=None):
+        return token
+
+    @app.post("/use_login/async")
+    @use_login(Credentials, User, "email")
+    async def login_async(data: Credentials, request: Request, response: Response, db: Session = Depends(get_db), token=None):
+        return token
+
+    @app.post("/use_register/sync")
+    @use_register(Credentials, User, "email")
+    def register_sync(data: Credentials, db: Session = Depends(get_db), new_user=None):
+        return {"id": new_user.id}
+
+    @app.post("/use_register/async")
+    @use_register(Credentials, User, "email")
+    async def register_async(data: Credentials, db: Session = Depends(get_db), new_user=None):
+        return {"id": new_user.id}
+
+    @app.post("/use_password_reset/sync")
+    @use_password_reset(Credentials, User, "hashed_password")
+    def reset_sync(data: Credentials, db: Session = Depends(get_db), user=None):
+        return {"id": user.id}
+
+    @app.post("/use_password_reset/async")
+    @use_password_reset(Credentials, User, "hashed_password")
+    async def reset_async(data: Credentials, db: Session = Depends(get_db), user=None):
+        return {"id": user.id}
+
+    @app.post("/use_logout/sync")
+    @use_logout(SECRET)
+    def logout_sync(request: Request, response: Response):
+        return {"ok": True}
+
+    @app.post("/use_logout/async")
+    @use_logout(SECRET)
+    async def logout_async(request: Request, response: Response):
+        return {"ok": True}
+
+    @app.post("/use_csrf/sync")
+    @use_csrf()
+    def csrf_sync(request: Request):
+        return {"ok": True}
+
+    @app.post("/use_csrf/async")
+    @use_csrf()
+    async def csrf_async(request: Request):
+        return {"ok": True}
+
+    @app.post("/use_admission_control/sync")
+    @use_admission_control()
+    def admission_sync(request: Request):
+        return {"ok": True}
+
+    @app.post("/use_admission_control/async")
+    @use_admission_control()
+    async def admission_async(request: Request):
+        return {"ok": True}
+
+    return app
+
+
+def per_request_us(client: TestClient, path: str, make_kwargs, number: int) -> float:
+    # Warm up once and check the route actually succeeds
+    response = client.post(path, **make_kwargs())
+    if response.status_code != 200:
+        raise RuntimeError(f"{path} returned {response.status_code}: {response.text}")
+
+    requests = [make_kwargs() for _ in range(number)]
+    start = time.perf_counter()
+    for kwargs in requests:
+        client.post(path, **kwargs)
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    get_pwd_context().update(bcrypt__rounds=4)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add(User(email=EMAIL, hashed_password=get_pwd_context().hash(PASSWORD)))
+        db.commit()
+
+    client = TestClient(build_app(), base_url="https://testserver")
+    access_token = client.post("/use_login/async", json={"email": EMAIL, "password": PASSWORD}).json()["access_token"]
+    new_emails = (f"user{i}@example.com" for i in itertools.count())
+
+    routes = {
+        "(bare route)": ("/bare", lambda: {}),
+        "use_login": ("/use_login", lambda: {"json": {"email": EMAIL, "password": PASSWORD}}),
+        "use_register": ("/use_register", lambda: {"json": {"email": next(new_emails), "password": PASSWORD}}),
+        "use_password_reset": ("/use_password_reset", lambda: {"json": {"email": EMAIL, "password": PASSWORD}}),
+        "use_logout": ("/use_logout", lambda: {"headers": {"Authorization": f"Bearer {access_token}"}}),
+        # Logout rotates the session's token, so read the current one (requests are built before timing)
+        "use_csrf": ("/use_csrf", lambda: {"headers": {CSRF_HEADER: client.get("/csrf").json()["csrf_token"]}}),
+        "use_admission_control": ("/use_admission_control", lambda: {}),
+    }
+
+    print(f"{'hook':<24} {'sync us':>10} {'async us':>10}")
+    for name, (prefix, make_kwargs) in routes.items():
+        sync_us = per_request_us(client, f"{prefix}/sync", make_kwargs, args.number)
+        async_us = per_request_us(client, f"{prefix}/async", make_kwargs, args.number)
+        print(f"{name:<24} {sync_us:>10.0f} {async_us:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
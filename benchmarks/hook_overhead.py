@@ -0,0 +1,91 @@
+"""
+Per-call overhead of each hook's wrapper for sync and async handlers.
+
+Handlers do no work, so the difference from the bare handler is the cost the
+hook adds. Async handlers are driven by hand (no event loop), so neither
+column includes scheduling or threadpool dispatch; hook_endpoints.py
+measures whole requests, including both.
+
+    python benchmarks/hook_overhead.py [--number 100000]
+"""
+import os
+import sys
+import timeit
+import argparse
+
+# Allow running as ``python benchmarks/<script>.py`` from a source checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Request, Response
+from fastapi_hooks.security.use_jwt import use_jwt, get_jwt_token
+from fastapi_hooks.security.use_cors import use_cors
+from fastapi_hooks.security.use_bruteforce import use_bruteforce
+from fastapi_hooks.security.use_rate_limit import use_rate_limit
+from fastapi_hooks.security.use_secure_headers import use_secure_headers
+
+SECRET = "benchmark-secret"
+
+HOOKS = {
+    "use_rate_limit": lambda: use_rate_limit(10 ** 12, 60),
+    "use_secure_headers": lambda: use_secure_headers(),
+    "use_cors": lambda: use_cors(allow_origins=["https://example.com"]),
+    "use_bruteforce": lambda: use_bruteforce(),
+    "use_jwt": lambda: use_jwt(SECRET),
+}
+
+
+def make_request() -> Request:
+    token = get_jwt_token(Response(), {"user_id": 1}, SECRET, "HS256")["access_token"]
+    return Request({
+        "type": "http",
+        "client": ("127.0.0.1", 1234),
+        "headers": [
+            (b"origin", b"https://example.com"),
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+    })
+
+
+def drive(coroutine):
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("handler awaited something; it cannot be driven synchronously")
+
+
+def sync_handler(request: Request, response: Response):
+    return response
+
+
+async def async_handler(request: Request, response: Response):
+    return response
+
+
+def per_call_ns(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e9
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    request, response = make_request(), Response()
+
+    bare_sync = per_call_ns(lambda: sync_handler(request=request, response=response), args.number)
+    bare_async = per_call_ns(lambda: drive(async_handler(request=request, response=response)), args.number)
+
+    print(f"{'hook':<20} {'sync +ns':>10} {'async +ns':>10}")
+    print(f"{'(bare handler)':<20} {bare_sync:>10.0f} {bare_async:>10.0f}")
+    for name, make_hook in HOOKS.items():
+        wrapped_sync = make_hook()(sync_handler)
+        wrapped_async = make_hook()(async_handler)
+        sync_ns = per_call_ns(lambda: wrapped_sync(request=request, response=response), args.number)
+        async_ns = per_call_ns(lambda: drive(wrapped_async(request=request, response=response)), args.number)
+        print(f"{name:<20} {sync_ns - bare_sync:>10.0f} {async_ns - bare_async:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Guard the import cost of the auth hooks with ``python -X importtime``.
+
+FastAPI itself is imported first, so only what fastapi_hooks adds on top is
+measured. Fails if a heavy dependency (sqlalchemy, passlib, jose) is loaded
+at import time or if the added import time exceeds the budget.
+
+    python benchmarks/importtime.py [--budget-ms 50]
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRELOADED = ["fastapi", "fastapi.responses", "starlette.concurrency"]
+
+MODULES = [
+    "fastapi_hooks",
+    "fastapi_hooks.auth.use_login",
+    "fastapi_hooks.auth.use_logout",
+    "fastapi_hooks.auth.use_register",
+    "fastapi_hooks.auth.use_password_reset",
+    "fastapi_hooks.auth.user_cache",
+    "fastapi_hooks.security.use_csrf",
+]
+
+FORBIDDEN = ("sqlalchemy", "passlib", "jose")
+
+
+def measure() -> list:
+    statement = f"import {', '.join(PRELOADED)}; import {', '.join(MODULES)}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        # ``-c`` puts the working directory on sys.path, so the checkout is importable
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # importtime indents nested imports by two spaces per level after one separator space
+        entries.append((name[1:].rstrip(), int(cumulative)))
+    return entries
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    entries = measure()
+
+    # Everything after FastAPI's top-level entry was imported by fastapi_hooks
+    start = max(i for i, (name, _) in enumerate(entries) if name == PRELOADED[0])
+    added = entries[start + 1:]
+
+    failed = False
+    loaded = sorted({name.strip().split(".")[0] for name, _ in added} & set(FORBIDDEN))
+    if loaded:
+        print(f"FAIL heavy dependencies imported eagerly: {', '.join(loaded)}")
+        failed = True
+
+    # Top-level entries carry the cumulative time of everything they pulled in
+    total_us = sum(cumulative for name, cumulative in added if not name.startswith(" "))
+    for name, cumulative in added:
+        if not name.startswith(" "):
+            print(f"{cumulative / 1000:8.2f} ms  {name}")
+    print(f"{total_us / 1000:8.2f} ms  total (budget {args.budget_ms:.0f} ms)")
+
+    if total_us / 1000 > args.budget_ms:
+        print("FAIL import time budget exceeded")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
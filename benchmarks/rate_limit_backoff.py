@@ -0,0 +1,77 @@
+"""
+Compare retry traffic against ``use_rate_limit`` for a client that retries
+blindly and one that waits for ``Retry-After``.
+
+Both clients need the same number of successful calls. Time is simulated, so
+the script runs instantly and is deterministic. Exits non-zero if honouring
+``Retry-After`` does not reduce the number of requests sent.
+
+    python benchmarks/rate_limit_backoff.py
+"""
+import os
+import sys
+from types import SimpleNamespace
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+# Allow running as ``python benchmarks/<script>.py`` from a source checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fastapi_hooks.security.use_rate_limit as rate_limit
+
+LIMIT = 5
+WINDOW_SECONDS = 10
+SUCCESSES_NEEDED = 30
+BLIND_RETRY_DELAY = 0.1
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+def make_client(clock: Clock) -> TestClient:
+    rate_limit.time = SimpleNamespace(time=clock.time)
+    rate_limit.rate_limit_store.clear()
+
+    app = FastAPI()
+
+    @app.get("/")
+    @rate_limit.use_rate_limit(LIMIT, WINDOW_SECONDS)
+    async def index(request: Request, response: Response):
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def run(obey_retry_after: bool) -> int:
+    clock = Clock()
+    client = make_client(clock)
+    sent = successes = 0
+
+    while successes < SUCCESSES_NEEDED:
+        response = client.get("/")
+        sent += 1
+        if response.status_code == 200:
+            successes += 1
+        elif obey_retry_after:
+            clock.now += int(response.headers["Retry-After"])
+        else:
+            clock.now += BLIND_RETRY_DELAY
+    return sent
+
+
+def main() -> int:
+    blind = run(obey_retry_after=False)
+    backoff = run(obey_retry_after=True)
+    print(f"{SUCCESSES_NEEDED} successful calls, limit {LIMIT}/{WINDOW_SECONDS}s")
+    print(f"  blind retry every {BLIND_RETRY_DELAY}s: {blind} requests")
+    print(f"  honouring Retry-After:  {backoff} requests")
+    return 0 if backoff < blind else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
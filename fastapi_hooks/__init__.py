@@ -0,0 +1,43 @@
+import importlib
+
+# Public hooks are resolved on first attribute access, so ``import fastapi_hooks``
+# only loads the modules (and their dependencies) an application actually uses.
+_lazy_exports = {
+    "use_login": "fastapi_hooks.auth.use_login",
+    "use_logout": "fastapi_hooks.auth.use_logout",
+    "use_register": "fastapi_hooks.auth.use_register",
+    "use_password_reset": "fastapi_hooks.auth.use_password_reset",
+    "request_reset": "fastapi_hooks.auth.use_password_reset",
+    "confirm_reset": "fastapi_hooks.auth.use_password_reset",
+    "ResetEmailQueue": "fastapi_hooks.auth.use_password_reset",
+    "UserCache": "fastapi_hooks.auth.user_cache",
+    "use_admission_control": "fastapi_hooks.security.use_admission_control",
+    "use_bruteforce": "fastapi_hooks.security.use_bruteforce",
+    "BruteforcePolicy": "fastapi_hooks.security.use_bruteforce",
+    "use_cors": "fastapi_hooks.security.use_cors",
+    "use_csrf": "fastapi_hooks.security.use_csrf",
+    "get_csrf_token": "fastapi_hooks.security.use_csrf",
+    "rotate_csrf_token": "fastapi_hooks.security.use_csrf",
+    "use_jwt": "fastapi_hooks.security.use_jwt",
+    "get_jwt_token": "fastapi_hooks.security.use_jwt",
+    "use_rate_limit": "fastapi_hooks.security.use_rate_limit",
+    "use_secure_headers": "fastapi_hooks.security.use_secure_headers",
+    "enable_profiling": "fastapi_hooks.profiling",
+    "disable_profiling": "fastapi_hooks.profiling",
+}
+
+__all__ = list(_lazy_exports)
+
+
+def __getattr__(name):
+    module = _lazy_exports.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,21 @@
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def get_pwd_context():
+    # passlib is only imported once a hook actually needs to hash or verify
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def legacy_pwd_context_getattr(module_name: str):
+    """
+    Module ``__getattr__`` for the hook modules that used to define their own
+    ``pwd_context``, so ``from ... import pwd_context`` keeps working.
+    """
+    def __getattr__(name):
+        if name == "pwd_context":
+            return get_pwd_context()
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    return __getattr__
@@ -1,29 +1,30 @@
-import functools
 import inspect
 from pydantic import BaseModel
 from typing import Callable,Type
 from fastapi import Request, Response, HTTPException, Depends,status
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from fastapi_hooks.security.use_jwt import get_jwt_token
+from fastapi_hooks.auth.password_context import get_pwd_context, legacy_pwd_context_getattr
+from fastapi_hooks.profiling import profiled
+from fastapi_hooks.handlers import wrap_route_handler
+from fastapi_hooks.security.use_csrf import rotate_session_csrf_token
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def use_login(schema,model,field):
+def use_login(schema,model,field,cache=None):
     def decorator(route_handler: Callable) -> Callable:
-        @functools.wraps(route_handler)
-        async def wrapper(*args, **kwargs):
-            sig = inspect.signature(route_handler)
-            params = sig.parameters
-            bound = sig.bind_partial(*args, **kwargs)
+        from sqlalchemy.orm import Session
+        from fastapi_hooks.security.use_jwt import get_jwt_token
+
+        sig = inspect.signature(route_handler)
+        params = sig.parameters
+
+        # Find the parameter matching the schema annotation
+        target_param = None
+        if schema:
+            for name, param in params.items():
+                if param.annotation is schema:
+                    target_param = name
+                    break
 
-            # Find the parameter matching the schema annotation
-            target_param = None
-            if schema:
-                for name, param in params.items():
-                    if param.annotation is schema:
-                        target_param = name
-                        break
+        def login(args, kwargs):
+            bound = sig.bind_partial(*args, **kwargs)
 
             if not target_param or target_param not in bound.arguments:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail="Unable to find the Login schema in your endpoint signature")
@@ -41,23 +42,29 @@ def use_login(schema,model,field):
             if value is None:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail=f"Missing required field '{field}'")
 
-            user = db.query(model).filter(column == value).first()
+            if cache is not None:
+                user = cache.load(db, model, field, value)
+            else:
+                user = db.query(model).filter(column == value).first()
             
             if not user:
                 raise HTTPException(status_code=401, detail="Invalid credentials.")
 
-            if not pwd_context.verify(login_data.password, user.hashed_password):
+            if not get_pwd_context().verify(login_data.password, user.hashed_password):
                 raise HTTPException(status_code=401, detail="Invalid credentials.")
             
             data={"user_id":user.id}
             
             token=get_jwt_token(response,data,"1234","HS256")
+
+            request = next((arg for arg in bound.arguments.values() if isinstance(arg, Request)), None)
+            rotate_session_csrf_token(request, response, user.id)
             
             kwargs["token"]=token
-            
-            return await route_handler(*args,**kwargs)
 
-        return wrapper
+        return wrap_route_handler(route_handler, before=profiled("use_login", login))
 
     return decorator
 
+
+__getattr__ = legacy_pwd_context_getattr(__name__)
@@ -1,14 +1,16 @@
-import functools
 from typing import Callable, Optional
 from fastapi import Request, Response
-from fastapi_hooks.security.use_jwt import validate_jwt_token, JWTTokenError
+from fastapi_hooks.security.use_csrf import rotate_session_csrf_token
+from fastapi_hooks.profiling import profiled
+from fastapi_hooks.handlers import wrap_route_handler
 
 
 def use_logout(secret_key: str, algorithm: str = "HS256", same_site: str = "strict") -> Callable:
 
     def decorator(route_handler: Callable) -> Callable:
-        @functools.wraps(route_handler)
-        async def wrapper(*args, **kwargs):
+        from fastapi_hooks.security.use_jwt import decode_jwt_token, JWTTokenError
+
+        def logout(args, kwargs):
             request: Optional[Request] = None
             response: Optional[Response] = None
             for arg in args:
@@ -24,7 +26,7 @@ def use_logout(secret_key: str, algorithm: str = "HS256", same_site: str = "stri
             if not request or not response:
                 raise JWTTokenError("Request or Response object not found in route handler parameters.")
 
-            await validate_jwt_token(request, response, secret_key, algorithm)
+            decode_jwt_token(request, response, secret_key, algorithm)
 
             response.delete_cookie(
                 key="refresh_token",
@@ -32,8 +34,8 @@ def use_logout(secret_key: str, algorithm: str = "HS256", same_site: str = "stri
                 secure=True
             )
 
-            return await route_handler(*args, **kwargs)
+            rotate_session_csrf_token(request, response)
 
-        return wrapper
+        return wrap_route_handler(route_handler, before=profiled("use_logout", logout))
 
     return decorator
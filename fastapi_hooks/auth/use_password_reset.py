@@ -1,42 +1,181 @@
-import functools
+import asyncio
+import hashlib
+import logging
+import secrets
 import inspect
-from typing import Callable
-from pydantic import BaseModel
+from typing import Awaitable, Callable, Optional
+from datetime import datetime, timedelta
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from sqlalchemy.exc import SQLAlchemyError
+from fastapi_hooks.auth.password_context import get_pwd_context, legacy_pwd_context_getattr
+from fastapi_hooks.profiling import profiled
+from fastapi_hooks.handlers import wrap_route_handler
+from starlette.concurrency import run_in_threadpool
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def use_password_reset(schema, model, password_field: str):
+RESET_TOKEN_EXPIRE = 30
+
+logger = logging.getLogger(__name__)
+
+
+def hash_reset_token(token: str) -> str:
+    # Tokens carry 256 bits of entropy, so a fast digest is enough to keep them unusable at rest
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def make_password_reset_token_model(base, tablename: str = "password_reset_tokens", user_id_type=None):
+    """
+    Build the declarative model that stores reset tokens.
+
+    The primary key is the SHA-256 hex digest of the token, so redeeming a
+    token is a primary-key lookup; ``user_id`` and ``expires_at`` are indexed
+    for invalidation and purging.
+    """
+    from sqlalchemy import Column, DateTime, Integer, String
+
+    return type("PasswordResetToken", (base,), {
+        "__tablename__": tablename,
+        "id": Column(String(64), primary_key=True),
+        "user_id": Column(user_id_type or Integer, nullable=False, index=True),
+        "expires_at": Column(DateTime, nullable=False, index=True),
+    })
+
+
+class ResetEmailQueue:
+    """
+    In-process queue that hands reset emails to ``send(recipient, token)`` from
+    a background task, so the request never waits on mail delivery.
+
+    Call ``start()`` on application startup and ``stop()`` on shutdown. Any
+    object with an ``enqueue(recipient, token)`` method can be used instead,
+    e.g. a stub that records tokens in local development.
+    """
+
+    def __init__(self, send: Callable[[str, str], Awaitable[None]], maxsize: int = 1000):
+        self.send = send
+        self.maxsize = maxsize
+        self.queue: Optional[asyncio.Queue] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.worker: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.maxsize)
+        self.worker = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        await self.queue.join()
+        self.worker.cancel()
+
+    async def run(self) -> None:
+        while True:
+            recipient, token = await self.queue.get()
+            try:
+                await self.send(recipient, token)
+            except Exception:
+                logger.exception("Failed to send password reset email")
+            finally:
+                self.queue.task_done()
+
+    def put(self, item) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Dropping is preferable to failing the request or blocking the caller
+            logger.warning("Reset email queue is full; dropping reset email")
+
+    def enqueue(self, recipient: str, token: str) -> None:
+        if self.queue is None:
+            raise RuntimeError("ResetEmailQueue.start() must be awaited before enqueueing emails.")
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self.loop:
+            self.put((recipient, token))
+        else:
+            # Sync route handlers run the hook in the threadpool
+            self.loop.call_soon_threadsafe(self.put, (recipient, token))
+
+
+def purge_expired_reset_tokens(db, token_model, batch_size: int = 1000) -> int:
+    """
+    Delete expired reset tokens in primary-key batches, committing after each
+    batch so no single statement holds locks on the whole table.
+
+    Returns:
+        int: Number of deleted tokens.
+    """
+    now = datetime.utcnow()
+    deleted = 0
+    while True:
+        ids = [row[0] for row in db.query(token_model.id).filter(token_model.expires_at < now).limit(batch_size).all()]
+        if not ids:
+            return deleted
+        db.query(token_model).filter(token_model.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            return deleted
+
+
+async def run_reset_token_purge(session_factory, token_model, interval_seconds: int = 300, batch_size: int = 1000) -> None:
+    """Background task that purges expired reset tokens every ``interval_seconds``."""
+
+    def purge():
+        db = session_factory()
+        try:
+            return purge_expired_reset_tokens(db, token_model, batch_size)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            await run_in_threadpool(purge)
+        except Exception:
+            # A transient DB error must not end the purge for the rest of the process
+            logger.exception("Failed to purge expired reset tokens")
+        await asyncio.sleep(interval_seconds)
+
+
+def find_schema_param(params, schema) -> Optional[str]:
+    if schema:
+        for name, param in params.items():
+            if param.annotation is schema:
+                return name
+    return None
+
+
+def bind_reset_arguments(sig, target_param, args, kwargs):
+    from sqlalchemy.orm import Session
+
+    bound = sig.bind_partial(*args, **kwargs)
+
+    if not target_param or target_param not in bound.arguments:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unable to find the password reset schema in your endpoint signature"
+        )
+
+    db: Session = bound.arguments.get("db")
+    if not isinstance(db, Session):
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database session not provided or invalid"
+        )
+    return bound.arguments[target_param], db
+
+
+def use_password_reset(schema, model, password_field: str, cache=None):
     def decorator(route_handler: Callable) -> Callable:
-        @functools.wraps(route_handler)
-        async def wrapper(*args, **kwargs):
-            sig = inspect.signature(route_handler)
-            bound = sig.bind_partial(*args, **kwargs)
-            params = sig.parameters
-
-            target_param = None
-            if schema:
-                for name, param in params.items():
-                    if param.annotation is schema:
-                        target_param = name
-                        break
-
-            if not target_param or target_param not in bound.arguments:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Unable to find the password reset schema in your endpoint signature"
-                )
+        from sqlalchemy.exc import SQLAlchemyError
 
-            reset_data: BaseModel = bound.arguments[target_param]
-            db: Session = bound.arguments.get("db")
-            if not isinstance(db, Session):
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Database session not provided or invalid"
-                )
+        sig = inspect.signature(route_handler)
+        target_param = find_schema_param(sig.parameters, schema)
+
+        def reset_password(args, kwargs):
+            reset_data, db = bind_reset_arguments(sig, target_param, args, kwargs)
 
             # Identify the user by a unique field in the schema (e.g., email)
             unique_fields = {k: v for k, v in reset_data.dict().items() if k != "password"}
@@ -56,7 +195,7 @@ def use_password_reset(schema, model, password_field: str):
                     detail="Password field is required"
                 )
 
-            setattr(user, password_field, pwd_context.hash(new_password))
+            setattr(user, password_field, get_pwd_context().hash(new_password))
 
             try:
                 db.add(user)
@@ -69,8 +208,140 @@ def use_password_reset(schema, model, password_field: str):
                     detail="Database error while resetting password"
                 )
 
+            if cache is not None:
+                cache.invalidate_user(user)
+
+            kwargs["user"] = user
+
+        return wrap_route_handler(route_handler, before=profiled("use_password_reset", reset_password))
+    return decorator
+
+
+def request_reset(schema, model, field: str, token_model, mailer, expires_minutes: int = RESET_TOKEN_EXPIRE, email_field: str = "email"):
+    """
+    Decorator that issues a single-use reset token for the user matching
+    ``schema.<field>`` and hands it to ``mailer.enqueue(recipient, token)``,
+    where ``recipient`` is the user's ``email_field``.
+
+    Only a hash of the token is stored. Status and body do not depend on
+    whether the user exists, but response time does (a token is only written
+    for existing users), so combine it with ``use_rate_limit``.
+    """
+    def decorator(route_handler: Callable) -> Callable:
+        from sqlalchemy.exc import SQLAlchemyError
+
+        sig = inspect.signature(route_handler)
+        target_param = find_schema_param(sig.parameters, schema)
+
+        def issue_token(args, kwargs):
+            request_data, db = bind_reset_arguments(sig, target_param, args, kwargs)
+
+            value = getattr(request_data, field, None)
+            if value is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Missing required field '{field}'"
+                )
+
+            user = db.query(model).filter(getattr(model, field) == value).first()
+            if not user:
+                return
+
+            token = secrets.token_urlsafe(32)
+            recipient = getattr(user, email_field)
+            try:
+                db.add(token_model(
+                    id=hash_reset_token(token),
+                    user_id=user.id,
+                    expires_at=datetime.utcnow() + timedelta(minutes=expires_minutes)
+                ))
+                db.commit()
+            except SQLAlchemyError:
+                # An error only existing users can hit must not change the response either
+                db.rollback()
+                logger.exception("Database error while issuing reset token")
+                return
+
+            # Mail problems must not change the response, or it would reveal that the account exists
+            try:
+                mailer.enqueue(recipient, token)
+            except Exception:
+                logger.exception("Failed to enqueue password reset email")
+
+        return wrap_route_handler(route_handler, before=profiled("request_reset", issue_token))
+
+    return decorator
+
+
+def confirm_reset(schema, model, token_model, password_field: str, token_field: str = "token", cache=None):
+    """
+    Decorator that redeems a reset token from ``schema.<token_field>`` and sets
+    the new ``password``. Deleting the token row is what redeems it, so of two
+    concurrent requests with the same token only one succeeds; the user's
+    other outstanding tokens are deleted in the same transaction. Injects
+    ``user`` like ``use_password_reset``.
+    """
+    def decorator(route_handler: Callable) -> Callable:
+        from sqlalchemy.exc import SQLAlchemyError
+
+        sig = inspect.signature(route_handler)
+        target_param = find_schema_param(sig.parameters, schema)
+
+        def redeem_token(args, kwargs):
+            reset_data, db = bind_reset_arguments(sig, target_param, args, kwargs)
+
+            token = getattr(reset_data, token_field, None)
+            new_password = getattr(reset_data, "password", None)
+            if not token or not new_password:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Both '{token_field}' and 'password' are required"
+                )
+
+            invalid_token = HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid or expired reset token"
+            )
+            token_hash = hash_reset_token(token)
+
+            try:
+                record = db.get(token_model, token_hash)
+                if not record:
+                    raise invalid_token
+                user_id, expires_at = record.user_id, record.expires_at
+
+                # A concurrent redemption of the same token deletes nothing here
+                if db.query(token_model).filter(token_model.id == token_hash).delete(synchronize_session=False) != 1:
+                    db.rollback()
+                    raise invalid_token
+
+                user = db.get(model, user_id)
+                if not user or expires_at < datetime.utcnow():
+                    # Keep the deletion, the token is useless either way
+                    db.commit()
+                    raise invalid_token
+
+                setattr(user, password_field, get_pwd_context().hash(new_password))
+                db.query(token_model).filter(token_model.user_id == user_id).delete(synchronize_session=False)
+                db.add(user)
+                db.commit()
+                db.refresh(user)
+            except SQLAlchemyError:
+                db.rollback()
+                logger.exception("Database error while resetting password")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Database error while resetting password"
+                )
+
+            if cache is not None:
+                cache.invalidate_user(user)
+
             kwargs["user"] = user
-            return await route_handler(*args, **kwargs)
 
-        return wrapper
+        return wrap_route_handler(route_handler, before=profiled("confirm_reset", redeem_token))
+
     return decorator
+
+
+__getattr__ = legacy_pwd_context_getattr(__name__)
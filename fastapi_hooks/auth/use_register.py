@@ -1,88 +1,91 @@
 import inspect
-from functools import wraps
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 from fastapi import HTTPException, status
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from fastapi_hooks.auth.password_context import get_pwd_context, legacy_pwd_context_getattr
+from fastapi_hooks.profiling import profiled
+from fastapi_hooks.handlers import wrap_route_handler
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-
-def use_register(schema, model, field):
+def use_register(schema, model, field, cache=None):
     def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            try:
-                sig = inspect.signature(func)
-                params = sig.parameters
-                bound = sig.bind_partial(*args, **kwargs)
-
-                # Find the parameter matching the schema annotation
-                target_param = None
-                if schema:
-                    for name, param in params.items():
-                        if param.annotation is schema:
-                            target_param = name
-                            break
-
-                if not target_param or target_param not in bound.arguments:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Unable to find the registration schema in your endpoint signature"
-                    )
-
-                # Extract the Pydantic data and DB session
-                user_data: BaseModel = bound.arguments[target_param]
-                db: Session = bound.arguments.get("db")
-                if not isinstance(db, Session):
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail="Database session not provided or invalid"
-                    )
-
-                column = getattr(model, field)
-                value = getattr(user_data, field, None)
-                if value is None:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Missing required field '{field}'"
-                    )
-
-                existing = db.query(model).filter(column == value).first()
-                if existing:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"A user with that {field} already exists"
-                    )
-
-                payload = user_data.dict()
-                if "password" in payload:
-                    payload["hashed_password"] = pwd_context.hash(payload.pop("password"))
-
-                new_user = model(**payload)
-                db.add(new_user)
-                db.commit()
-                db.refresh(new_user)
-                
-                kwargs['new_user'] = new_user
-
-                return await func(*args,**kwargs)
-                
-                
-            except HTTPException:
-                raise
-            except IntegrityError as ie:
-                db.rollback()
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail="Database integrity error: possibly duplicate or invalid data")
-            except SQLAlchemyError as se:
+        from sqlalchemy.orm import Session
+        from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+        sig = inspect.signature(func)
+        params = sig.parameters
+
+        # Find the parameter matching the schema annotation
+        target_param = None
+        if schema:
+            for name, param in params.items():
+                if param.annotation is schema:
+                    target_param = name
+                    break
+
+        def register(args, kwargs):
+            bound = sig.bind_partial(*args, **kwargs)
+
+            if not target_param or target_param not in bound.arguments:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Unable to find the registration schema in your endpoint signature"
+                )
+
+            # Extract the Pydantic data and DB session
+            user_data: BaseModel = bound.arguments[target_param]
+            db: Session = bound.arguments.get("db")
+            if not isinstance(db, Session):
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Database session not provided or invalid"
+                )
+
+            column = getattr(model, field)
+            value = getattr(user_data, field, None)
+            if value is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Missing required field '{field}'"
+                )
+
+            existing = db.query(model).filter(column == value).first()
+            if existing:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"A user with that {field} already exists"
+                )
+
+            payload = user_data.dict()
+            if "password" in payload:
+                payload["hashed_password"] = get_pwd_context().hash(payload.pop("password"))
+
+            new_user = model(**payload)
+            db.add(new_user)
+            db.commit()
+            db.refresh(new_user)
+
+            # Drop any cached "unknown user" entry for the new account
+            if cache is not None:
+                cache.invalidate_user(new_user)
+            
+            kwargs['new_user'] = new_user
+
+        def registration_error(e, args, kwargs, state):
+            if isinstance(e, HTTPException):
+                return e
+            if isinstance(e, SQLAlchemyError):
+                db: Session = sig.bind_partial(*args, **kwargs).arguments.get("db")
                 db.rollback()
-                print(se)
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,detail="Internal database error")
-            except Exception as e:
+                if isinstance(e, IntegrityError):
+                    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail="Database integrity error: possibly duplicate or invalid data")
                 print(e)
-                raise HTTPException( status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
+                return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,detail="Internal database error")
+            print(e)
+            return HTTPException( status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unexpected server error")
 
-        return wrapper
+        return wrap_route_handler(func, before=profiled("use_register", register), on_error=registration_error)
 
     return decorator
+
+
+__getattr__ = legacy_pwd_context_getattr(__name__)
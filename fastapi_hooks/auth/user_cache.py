@@ -0,0 +1,108 @@
+import time
+from threading import Lock
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Iterable, Optional
+
+
+class UserCache:
+    """
+    Short-TTL cache of slim user records keyed by ``(field, value)``.
+
+    Only ``columns`` are loaded and cached, as a ``SimpleNamespace``. Unknown
+    identifiers are cached as misses for ``negative_ttl`` seconds, so repeated
+    lookups of non-existent accounts do not reach the database. At ``maxsize``
+    the least recently used entry is evicted in O(1). Entries are
+    guarded by a lock, so one cache can be shared by async routes on the event
+    loop and sync routes in the threadpool.
+
+    Pass it as ``cache`` to ``use_login`` and to the register/reset hooks (which
+    invalidate entries). Routes behind ``use_jwt`` can share it through
+    ``cache.load(db, model, "id", request.state.user["user_id"])``.
+    """
+
+    def __init__(self, ttl: float = 30, negative_ttl: float = 5, maxsize: int = 10000,
+                 columns: Iterable[str] = ("id", "hashed_password")):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self.columns = tuple(columns)
+        self.entries = OrderedDict()
+        self.swept_at = time.monotonic()
+        self.fields = set()
+        self.generation = 0
+        self.lock = Lock()
+
+    def get(self, field: str, value):
+        """Return ``(hit, record)``; ``record`` is None for a cached miss."""
+        key = (field, value)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, record = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return False, None
+            self.entries.move_to_end(key)
+            return True, record
+
+    def set(self, field: str, value, record: Optional[SimpleNamespace], generation: Optional[int] = None) -> None:
+        ttl = self.ttl if record is not None else self.negative_ttl
+        key = (field, value)
+        now = time.monotonic()
+        with self.lock:
+            # Skip results loaded before an invalidation, they may already be stale
+            if generation is not None and generation != self.generation:
+                return
+            if now - self.swept_at >= min(self.ttl, self.negative_ttl):
+                self.sweep(now)
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            elif len(self.entries) >= self.maxsize:
+                # Least recently used entry goes first
+                self.entries.popitem(last=False)
+            self.fields.add(field)
+            self.entries[key] = (now + ttl, record)
+
+    def sweep(self, now: float) -> None:
+        # Full scan, but at most once per TTL rather than on every insert
+        for key in [key for key, (expires_at, _) in self.entries.items() if expires_at < now]:
+            del self.entries[key]
+        self.swept_at = now
+
+    def invalidate(self, field: str, value) -> None:
+        with self.lock:
+            self.generation += 1
+            self.entries.pop((field, value), None)
+
+    def invalidate_user(self, user) -> None:
+        """Drop every entry keyed by one of ``user``'s cached field values."""
+        with self.lock:
+            self.generation += 1
+            for field in self.fields:
+                self.entries.pop((field, getattr(user, field, None)), None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+    def load(self, db, model, field: str, value) -> Optional[SimpleNamespace]:
+        """
+        Return the slim record for ``model.<field> == value``, querying only
+        ``columns`` on a cache miss. Returns None if no such user exists.
+        """
+        hit, record = self.get(field, value)
+        if hit:
+            return record
+
+        generation = self.generation
+        row = (
+            db.query(*[getattr(model, column) for column in self.columns])
+            .filter(getattr(model, field) == value)
+            .first()
+        )
+        record = SimpleNamespace(**dict(zip(self.columns, row))) if row else None
+        self.set(field, value, record, generation)
+        return record
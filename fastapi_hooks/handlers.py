@@ -0,0 +1,49 @@
+import inspect
+import functools
+from typing import Callable, Optional
+
+
+def wrap_route_handler(route_handler: Callable, before: Optional[Callable] = None,
+                       after: Optional[Callable] = None, on_error: Optional[Callable] = None) -> Callable:
+    """
+    Wrap ``route_handler`` with a hook's per-request steps. Coroutine handlers
+    get an async wrapper; anything else gets a plain function, so FastAPI still
+    runs it in its threadpool instead of on the event loop.
+
+    Args:
+        before: ``before(args, kwargs)`` runs ahead of the handler. Its return
+            value is passed on to ``after`` and ``on_error`` as ``state``.
+        after: ``after(result, state)`` runs once the handler returned. Its
+            return value replaces the handler's result.
+        on_error: ``on_error(e, args, kwargs, state)`` returns the exception to
+            raise for anything the steps above raised. ``state`` is None when
+            ``before`` itself failed.
+    """
+    if inspect.iscoroutinefunction(route_handler):
+        @functools.wraps(route_handler)
+        async def wrapper(*args, **kwargs):
+            state = None
+            try:
+                if before is not None:
+                    state = before(args, kwargs)
+                result = await route_handler(*args, **kwargs)
+                return after(result, state) if after is not None else result
+            except Exception as e:
+                if on_error is None:
+                    raise
+                raise on_error(e, args, kwargs, state)
+    else:
+        @functools.wraps(route_handler)
+        def wrapper(*args, **kwargs):
+            state = None
+            try:
+                if before is not None:
+                    state = before(args, kwargs)
+                result = route_handler(*args, **kwargs)
+                return after(result, state) if after is not None else result
+            except Exception as e:
+                if on_error is None:
+                    raise
+                raise on_error(e, args, kwargs, state)
+
+    return wrapper
@@ -0,0 +1,258 @@
+import io
+import os
+import sys
+import json
+import random
+import logging
+import secrets
+import functools
+import threading
+from typing import Callable, Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+
+logger = logging.getLogger(__name__)
+
+profiling_config: Optional[dict] = None
+profile_reports = {}
+# Guards profile_reports; only held while merging or formatting, never around a hook call
+profile_lock = threading.Lock()
+# cProfile and tracemalloc snapshots are process wide, so one sample runs at a time
+sampler_lock = threading.Lock()
+
+
+def enable_profiling(sample_rate: float = 0.01, trace_allocations: bool = True) -> None:
+    """
+    Start sampling hook executions.
+
+    Args:
+        sample_rate: Fraction of calls per hook to profile, in (0, 1].
+        trace_allocations: Also record allocations still held after sampled
+            calls. tracemalloc is started and stopped around each sampled call
+            (unless the application already traces), so unsampled requests pay
+            nothing, but a sampled call runs several times slower.
+    """
+    global profiling_config
+
+    if not 0 < sample_rate <= 1:
+        raise ValueError("sample_rate must be in the range (0, 1]")
+
+    profiling_config = {
+        "sample_rate": sample_rate,
+        "trace_allocations": trace_allocations,
+    }
+
+
+def disable_profiling() -> None:
+    """Stop sampling. Collected reports are kept until reset_profiling()."""
+    global profiling_config
+    profiling_config = None
+
+
+def reset_profiling() -> None:
+    with profile_lock:
+        profile_reports.clear()
+
+
+def collect_allocations(before, after) -> dict:
+    import tracemalloc
+
+    # Only allocations still alive after the hook returned are attributed to it
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    after = after.filter_traces(ignore)
+    if before is None:
+        # Tracing started with the sample, so every live trace was allocated during it
+        stats = [(stat.traceback, stat.size, stat.count) for stat in after.statistics("lineno")]
+    else:
+        stats = [(stat.traceback, stat.size_diff, stat.count_diff)
+                 for stat in after.compare_to(before.filter_traces(ignore), "lineno")]
+
+    allocations = {}
+    for traceback, size, count in stats:
+        if size <= 0:
+            continue
+        frame = traceback[0]
+        totals = allocations.setdefault(f"{frame.filename}:{frame.lineno}", [0, 0])
+        totals[0] += size
+        totals[1] += count
+    return allocations
+
+
+def record_sample(hook_name: str, profiler, before, after) -> None:
+    import pstats
+
+    # Build everything expensive before taking the lock
+    stats = pstats.Stats(profiler)
+    allocations = collect_allocations(before, after) if after is not None else {}
+
+    with profile_lock:
+        report = profile_reports.setdefault(hook_name, {"samples": 0, "stats": None, "allocations": {}})
+        report["samples"] += 1
+
+        if report["stats"] is None:
+            report["stats"] = stats
+        else:
+            report["stats"].add(stats)
+
+        for location, (size, count) in allocations.items():
+            totals = report["allocations"].setdefault(location, [0, 0])
+            totals[0] += size
+            totals[1] += count
+
+
+def profiled(hook_name: str, func: Callable) -> Callable:
+    """
+    Wrap a hook's synchronous per-request work so a sample of calls is profiled.
+
+    Costs a global lookup per call while profiling is disabled. Failures of the
+    profiler itself are logged and never change the result or exception of
+    ``func``.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        config = profiling_config
+        if config is None or random.random() >= config["sample_rate"]:
+            return func(*args, **kwargs)
+
+        if not sampler_lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+
+        import cProfile
+        import tracemalloc
+
+        profiler = cProfile.Profile()
+        sampling = started_tracing = False
+        before = after = None
+        try:
+            try:
+                if config["trace_allocations"]:
+                    if tracemalloc.is_tracing():
+                        before = tracemalloc.take_snapshot()
+                    else:
+                        tracemalloc.start()
+                        started_tracing = True
+                profiler.enable()
+                sampling = True
+            except Exception:
+                logger.exception("Could not start profiling sample for %s", hook_name)
+
+            try:
+                return func(*args, **kwargs)
+            finally:
+                try:
+                    if sampling:
+                        profiler.disable()
+                        if (started_tracing or before is not None) and tracemalloc.is_tracing():
+                            after = tracemalloc.take_snapshot()
+                except Exception:
+                    sampling = False
+                    logger.exception("Could not finish profiling sample for %s", hook_name)
+                if started_tracing:
+                    tracemalloc.stop()
+        finally:
+            sampler_lock.release()
+            if sampling:
+                try:
+                    record_sample(hook_name, profiler, before, after)
+                except Exception:
+                    logger.exception("Could not record profiling sample for %s", hook_name)
+
+    return wrapper
+
+
+def format_report(reports: dict, limit: int = 20) -> str:
+    out = io.StringIO()
+    for hook_name in sorted(reports):
+        report = reports[hook_name]
+        out.write(f"==== {hook_name} ({report['samples']} samples)\n")
+
+        if report["stats"] is not None:
+            report["stats"].stream = out
+            report["stats"].sort_stats("cumulative").print_stats(limit)
+
+        allocations = sorted(report["allocations"].items(), key=lambda item: item[1][0], reverse=True)
+        if allocations:
+            out.write("Allocations (bytes, blocks) still held after the hook returned:\n")
+            for location, (size, count) in allocations[:limit]:
+                out.write(f"  {size:>10} {count:>7}  {location}\n")
+        out.write("\n")
+    return out.getvalue()
+
+
+def get_profile_report(limit: int = 20) -> str:
+    with profile_lock:
+        return format_report(profile_reports, limit)
+
+
+def dump_profile(directory: str) -> None:
+    """
+    Write one ``<hook>.prof`` (pstats) and ``<hook>.alloc.json`` file per hook
+    into ``directory``, to be read back with ``python -m fastapi_hooks.profiling``.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with profile_lock:
+        for hook_name, report in profile_reports.items():
+            if report["stats"] is not None:
+                report["stats"].dump_stats(os.path.join(directory, f"{hook_name}.prof"))
+            with open(os.path.join(directory, f"{hook_name}.alloc.json"), "w") as f:
+                json.dump({"samples": report["samples"], "allocations": report["allocations"]}, f)
+
+
+def load_profile(directory: str) -> dict:
+    import pstats
+
+    reports = {}
+    for filename in os.listdir(directory):
+        if not filename.endswith(".alloc.json"):
+            continue
+        hook_name = filename[:-len(".alloc.json")]
+        with open(os.path.join(directory, filename)) as f:
+            data = json.load(f)
+
+        stats_path = os.path.join(directory, f"{hook_name}.prof")
+        reports[hook_name] = {
+            "samples": data["samples"],
+            "stats": pstats.Stats(stats_path) if os.path.exists(stats_path) else None,
+            "allocations": data["allocations"],
+        }
+    return reports
+
+
+def create_profile_router(token: str, path: str = "/_hooks/profile") -> APIRouter:
+    """
+    Router exposing the current report as plain text. Requests must send
+    ``token`` in the ``X-Profile-Token`` header. The endpoint is a sync
+    function, so formatting the report runs in the threadpool, not on the
+    event loop.
+    """
+    if not token:
+        raise ValueError("A non-empty token is required to expose profiling reports.")
+
+    router = APIRouter()
+
+    @router.get(path, response_class=PlainTextResponse, include_in_schema=False)
+    def profile_report(request: Request, limit: int = 20):
+        submitted = request.headers.get(PROFILE_TOKEN_HEADER, "")
+        if not secrets.compare_digest(submitted.encode(), token.encode()):
+            raise HTTPException(status_code=403, detail="Invalid profiling token")
+        return get_profile_report(limit)
+
+    return router
+
+
+def main(argv=None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m fastapi_hooks.profiling", description="Print hook profiling reports written by dump_profile().")
+    parser.add_argument("directory")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    sys.stdout.write(format_report(load_profile(args.directory), args.limit))
+
+
+if __name__ == "__main__":
+    main()
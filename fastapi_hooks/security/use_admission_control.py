@@ -0,0 +1,163 @@
+import math
+import time
+import asyncio
+import inspect
+import functools
+from collections import deque
+from typing import Callable, Optional
+from fastapi import Request, HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.status import HTTP_429_TOO_MANY_REQUESTS, HTTP_503_SERVICE_UNAVAILABLE
+from fastapi_hooks.security.use_bruteforce import BruteforcePolicy
+
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded FIFO wait queue.
+
+    When ``target_latency`` is set, the limit is adjusted AIMD-style: it is
+    halved while the measured handler latency (an EWMA) is above the target
+    and grows back by one per request towards ``max_concurrency`` once it
+    recovers.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float,
+                 target_latency: Optional[float] = None, min_concurrency: int = 1):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = max(1, min(min_concurrency, max_concurrency))
+        self.limit = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.latency = 0.0
+        self.decreased_at = 0.0
+        self.in_flight = 0
+        self.waiters = deque()
+
+    def retry_after(self) -> int:
+        # Rough time for the current backlog to drain, never less than a second
+        backlog = len(self.waiters) + self.in_flight
+        return max(1, math.ceil(self.latency * backlog / self.limit))
+
+    def shed(self):
+        raise HTTPException(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy. Try again later.",
+            headers={"Retry-After": str(self.retry_after())}
+        )
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.limit and not self.waiters:
+            self.in_flight += 1
+            return
+
+        if len(self.waiters) >= self.max_queue:
+            self.shed()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            if not waiter.done():
+                waiter.cancel()
+                self.waiters.remove(waiter)
+            else:
+                # wake() already granted us a slot we will never use
+                self.release()
+            raise
+
+        if not waiter.done():
+            waiter.cancel()
+            self.waiters.remove(waiter)
+            self.shed()
+        # wake() counted our slot in in_flight before resolving the waiter
+
+    def wake(self) -> None:
+        while self.waiters and self.in_flight < self.limit:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self.wake()
+
+    def record(self, elapsed: float) -> None:
+        self.latency = elapsed if not self.latency else 0.8 * self.latency + 0.2 * elapsed
+
+        if self.target_latency is None:
+            return
+        if self.latency > self.target_latency:
+            # Halve at most once per measured latency, so one slow burst is not counted many times over
+            now = time.monotonic()
+            if now - self.decreased_at >= self.latency:
+                self.limit = max(self.min_concurrency, self.limit // 2)
+                self.decreased_at = now
+        elif self.limit < self.max_concurrency:
+            self.limit += 1
+            self.wake()
+
+
+def use_admission_control(
+    max_concurrency: int = 8,
+    max_queue: int = 32,
+    queue_timeout: float = 2.0,
+    target_latency: Optional[float] = None,
+    min_concurrency: int = 1,
+    bruteforce: Optional[BruteforcePolicy] = None,
+) -> Callable:
+    """
+    Decorator to bound the work an expensive route (e.g. bcrypt-bound login)
+    may queue up.
+
+    Requests beyond ``max_concurrency`` wait in a queue of at most ``max_queue``
+    entries for up to ``queue_timeout`` seconds; anything else gets a 503 with
+    ``Retry-After``. If ``bruteforce`` is given, clients already locked out
+    under that policy are rejected before entering the queue; pass the same
+    ``BruteforcePolicy`` to ``use_bruteforce(policy=...)`` so the two agree.
+
+    Returns:
+        Callable: Decorated route function.
+    """
+    controller = AdmissionController(max_concurrency, max_queue, queue_timeout, target_latency, min_concurrency)
+
+    def decorator(route_handler: Callable) -> Callable:
+        is_async = inspect.iscoroutinefunction(route_handler)
+
+        @functools.wraps(route_handler)
+        async def wrapper(*args, **kwargs):
+            if bruteforce is not None:
+                request: Optional[Request] = None
+                for arg in list(args) + list(kwargs.values()):
+                    if isinstance(arg, Request):
+                        request = arg
+                        break
+                client_ip = request.client.host if request else "unknown"
+
+                if bruteforce.is_locked_out(client_ip):
+                    raise HTTPException(
+                        status_code=HTTP_429_TOO_MANY_REQUESTS,
+                        detail="Too many failed login attempts. Try again later."
+                    )
+
+            await controller.acquire()
+            start = time.perf_counter()
+            try:
+                if is_async:
+                    return await route_handler(*args, **kwargs)
+                # Slots are managed on the event loop, so sync handlers are sent to the threadpool from here
+                return await run_in_threadpool(route_handler, *args, **kwargs)
+            finally:
+                controller.record(time.perf_counter() - start)
+                controller.release()
+
+        return wrapper
+
+    return decorator
@@ -1,41 +1,60 @@
 import time
-from functools import wraps
 from fastapi import Request, HTTPException
+from fastapi_hooks.profiling import profiled
+from fastapi_hooks.handlers import wrap_route_handler
 
 failed_attempts = {}
 
-def use_bruteforce(max_attempts=5, window_seconds=60):
+class BruteforcePolicy:
+    """
+    Lockout thresholds shared by ``use_bruteforce`` and anything that needs to
+    know whether a client is locked out (e.g. ``use_admission_control``).
+    """
+
+    def __init__(self, max_attempts=5, window_seconds=60):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+
+    def recent_attempts(self, client_ip, now):
+        # keep only recent failed attempts
+        return [t for t in failed_attempts.get(client_ip, []) if now - t < self.window_seconds]
+
+    def is_locked_out(self, client_ip, now=None):
+        attempts = self.recent_attempts(client_ip, time.time() if now is None else now)
+        return len(attempts) >= self.max_attempts
+
+def use_bruteforce(max_attempts=5, window_seconds=60, policy=None):
+    policy = policy or BruteforcePolicy(max_attempts, window_seconds)
+
     def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
+        def check(args, kwargs):
             request: Request = kwargs.get("request")
             client_ip = request.client.host if request else "unknown"
 
             now = time.time()
-            user_attempts = failed_attempts.get(client_ip, [])
-
-            # keep only recent failed attempts
-            user_attempts = [t for t in user_attempts if now - t < window_seconds]
+            user_attempts = policy.recent_attempts(client_ip, now)
 
-            if len(user_attempts) >= max_attempts:
+            if len(user_attempts) >= policy.max_attempts:
                 raise HTTPException(
                     status_code=429,
                     detail="Too many failed login attempts. Try again later."
                 )
-
-            try:
-                result = await func(*args, **kwargs)
-
-                # if login success → clear failed attempts for that IP
-                if getattr(result, "status_code", 200) == 200:
-                    failed_attempts[client_ip] = []
-                return result
-
-            except HTTPException as e:
-                # only count failed login (like 401/403)
-                if e.status_code in (401, 403):
-                    user_attempts.append(now)
-                    failed_attempts[client_ip] = user_attempts
-                raise e
-        return wrapper
+            return client_ip, now, user_attempts
+
+        def record(result, state):
+            client_ip, _, _ = state
+            # if login success → clear failed attempts for that IP
+            if getattr(result, "status_code", 200) == 200:
+                failed_attempts[client_ip] = []
+            return result
+
+        def record_failure(e, args, kwargs, state):
+            # only count failed login (like 401/403), not our own 429
+            if state is not None and isinstance(e, HTTPException) and e.status_code in (401, 403):
+                client_ip, now, user_attempts = state
+                user_attempts.append(now)
+                failed_attempts[client_ip] = user_attempts
+            return e
+
+        return wrap_route_handler(func, before=profiled("use_bruteforce", check), after=record, on_error=record_failure)
     return decorator
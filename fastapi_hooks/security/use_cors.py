@@ -1,6 +1,7 @@
-import functools
 from fastapi import Response,Request
 from typing import Optional
+from fastapi_hooks.profiling import profiled
+from fastapi_hooks.handlers import wrap_route_handler
 
 cors_presets = {
     # 1. Public read-only APIs
@@ -159,8 +160,7 @@ def use_cors(preset_or_kwargs="public", **kwargs):
         raise ValueError("CORS policy must define non-empty 'allow_origins'. Set it explicitly when using @use_cors().")
 
     def decorator(route_handler):
-        @functools.wraps(route_handler)
-        async def wrapper(*args, **kwargs):
+        def find_request_response(args, kwargs):
             request:Optional[Request]=None
             response: Optional[Response] = None
             
@@ -178,11 +178,15 @@ def use_cors(preset_or_kwargs="public", **kwargs):
             
             if not response or not request:
                 raise RuntimeError("Request or Response object not found in route handler parameters.")
-            
-            result = await route_handler(*args, **kwargs)
-            set_cors_headers(request,response, policy)
+            return request, response
+
+        apply_cors = profiled("use_cors", set_cors_headers)
+
+        def add_cors_headers(result, state):
+            request, response = state
+            apply_cors(request,response, policy)
             return result
 
-        return wrapper
+        return wrap_route_handler(route_handler, before=find_request_response, after=add_cors_headers)
 
     return decorator
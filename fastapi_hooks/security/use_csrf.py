@@ -1,14 +1,23 @@
+import time
+import inspect
 import secrets
 import functools
 from typing import Callable, Optional
 from fastapi import HTTPException, Request, Response
-from starlette.middleware.sessions import SessionMiddleware
+from starlette.concurrency import run_in_threadpool
 
 
 # CSRF token key for session and header
 CSRF_TOKEN_KEY = "csrf_token"
 CSRF_HEADER = "X-CSRF-Token"
 
+# Session keys recording when, and for which privilege level, the token was issued
+CSRF_ISSUED_AT_KEY = "csrf_token_issued_at"
+CSRF_PRIVILEGE_KEY = "csrf_token_privilege"
+
+# Seconds a token is reused before get_csrf_token() issues a new one
+CSRF_TOKEN_MAX_AGE = 3600
+
 def generate_csrf_token() -> str:
     """
     Generate a cryptographically secure CSRF token.
@@ -19,13 +28,14 @@ def generate_csrf_token() -> str:
     return secrets.token_urlsafe(32)
 
 
-def store_csrf_token(request: Request, response: Response, token: str) -> None:
-    
+def get_session(request: Request):
     try:
-        request.session[CSRF_TOKEN_KEY] = token
+        return request.session
     except AssertionError:
         raise HTTPException(status_code=500,detail="SessionMiddleware required for CSRF token storage. Add it to your FastAPI app.")
 
+
+def set_csrf_cookie(response: Response, token: str) -> None:
     response.set_cookie(
         key=CSRF_TOKEN_KEY,
         value=token,
@@ -35,19 +45,80 @@ def store_csrf_token(request: Request, response: Response, token: str) -> None:
     )
 
 
-def get_csrf_token(request: Request, response: Response) -> dict:
+def store_csrf_token(request: Request, response: Response, token: str, privilege=None) -> None:
+    
+    session = get_session(request)
+    session[CSRF_TOKEN_KEY] = token
+    session[CSRF_ISSUED_AT_KEY] = int(time.time())
+    session[CSRF_PRIVILEGE_KEY] = privilege
+
+    set_csrf_cookie(response, token)
+
+
+def is_csrf_token_expired(session, max_age: Optional[int]) -> bool:
+    if max_age is None:
+        return False
+    issued_at = session.get(CSRF_ISSUED_AT_KEY)
+    # Tokens stored without a timestamp predate the rotation policy
+    return issued_at is None or time.time() - issued_at >= max_age
+
+
+def rotate_csrf_token(request: Request, response: Response, privilege=None) -> dict:
+    """
+    Unconditionally issue a new CSRF token, e.g. right after login or logout.
+
+    Returns:
+        dict: JSON response with the new CSRF token.
     """
-    Generate and store a CSRF token, returning it for frontend use.
+    token = generate_csrf_token()
+    store_csrf_token(request, response, token, privilege)
+    return {"csrf_token": token}
+
+
+def rotate_session_csrf_token(request: Optional[Request], response: Optional[Response], privilege=None) -> None:
+    """
+    Rotate the CSRF token if the app uses sessions; a no-op otherwise.
+
+    Called by use_login and use_logout so a token issued before a privilege
+    change never stays valid after it.
+    """
+    if request is None or response is None or "session" not in request.scope:
+        return
+    rotate_csrf_token(request, response, privilege)
+
+
+def get_csrf_token(request: Request, response: Response, max_age: Optional[int] = CSRF_TOKEN_MAX_AGE, privilege=None) -> dict:
+    """
+    Return the session's CSRF token, issuing a new one only when needed.
+
+    The stored token is reused until it is older than ``max_age`` seconds or
+    ``privilege`` differs from the value it was issued for. While it is reused
+    the session is left untouched, and the cookie is only set again if the
+    client did not send it back, so repeat calls cause no ``Set-Cookie``.
 
     Args:
         request: FastAPI Request object to access session.
         response: FastAPI Response object to set the cookie.
+        max_age: Seconds before the token is rotated; None disables age-based rotation.
+        privilege: JSON-serialisable marker of the caller's privilege level
+            (e.g. user id or role); a change forces rotation. When None, the
+            marker is not checked (use_login and use_logout already rotate).
 
     Returns:
         dict: JSON response with the CSRF token (e.g., {"csrf_token": "..."}).
     """
-    token = generate_csrf_token()
-    store_csrf_token(request, response, token)
+    session = get_session(request)
+    token = session.get(CSRF_TOKEN_KEY)
+
+    stored_privilege = session.get(CSRF_PRIVILEGE_KEY)
+    if privilege is None:
+        privilege = stored_privilege
+
+    if not token or stored_privilege != privilege or is_csrf_token_expired(session, max_age):
+        return rotate_csrf_token(request, response, privilege)
+
+    if request.cookies.get(CSRF_TOKEN_KEY) != token:
+        set_csrf_cookie(response, token)
     return {"csrf_token": token}
 
     
@@ -74,18 +145,24 @@ async def validate_csrf_token(request: Request, session_token: str) -> None:
         except Exception:
             raise HTTPException(400, detail="Malformed or empty JSON body; CSRF token missing")
 
-    if not submitted_token or not secrets.compare_digest(submitted_token, session_token):
+    if not submitted_token or not session_token or not secrets.compare_digest(submitted_token, session_token):
         raise HTTPException(status_code=403, detail="Invalid CSRF token")
 
 
-def use_csrf() -> Callable:
+def use_csrf(max_age: Optional[int] = None) -> Callable:
     """
     Decorator to validate CSRF token from request headers/form/json.
 
+    Args:
+        max_age: If set, tokens older than this many seconds are rejected so
+            clients must fetch a rotated one from get_csrf_token().
+
     Returns:
         Callable: Decorated route function.
     """
     def decorator(route_handler: Callable) -> Callable:
+        is_async = inspect.iscoroutinefunction(route_handler)
+
         @functools.wraps(route_handler)
         async def async_wrapper(*args, **kwargs):
             request: Optional[Request] = None
@@ -101,13 +178,16 @@ def use_csrf() -> Callable:
             if not request:
                 raise RuntimeError("No Request object found in route handler parameters")
 
-            try:
-                session_token = request.session.get(CSRF_TOKEN_KEY)
-            except AssertionError:
-                 raise HTTPException(status_code=500,detail="SessionMiddleware required for CSRF token storage. Add it to your FastAPI app.")
-            await validate_csrf_token(request, session_token)
+            session = get_session(request)
+            if is_csrf_token_expired(session, max_age):
+                raise HTTPException(status_code=403, detail="CSRF token expired")
+            await validate_csrf_token(request, session.get(CSRF_TOKEN_KEY))
 
-            return await route_handler(*args, **kwargs)
+            if is_async:
+                return await route_handler(*args, **kwargs)
+            # Validation may need to read the body, so this wrapper stays async and
+            # dispatches sync handlers to the threadpool itself, exactly once
+            return await run_in_threadpool(route_handler, *args, **kwargs)
 
         return async_wrapper
 
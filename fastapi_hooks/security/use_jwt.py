@@ -1,11 +1,12 @@
 import json
-import functools
 from typing import Callable, Optional
 from jose.constants import ALGORITHMS
 from datetime import datetime, timedelta
 from jose import jwt,ExpiredSignatureError
 from fastapi import Request,Response,HTTPException
 from jose.exceptions import JWTError, JWKError, JWSError
+from fastapi_hooks.profiling import profiled
+from fastapi_hooks.handlers import wrap_route_handler
 
 
 TOKEN_EXPIRE = 15
@@ -74,7 +75,7 @@ def get_jwt_token(response: Response, data:dict,secret_key:str,algorithm:str,sam
         }
 
 
-async def validate_jwt_token(request: Request,response: Response,secret_key: str,algorithm: str):
+def decode_jwt_token(request: Request,response: Response,secret_key: str,algorithm: str):
 
     token = None
     user_payload = None
@@ -114,12 +115,15 @@ async def validate_jwt_token(request: Request,response: Response,secret_key: str
         raise HTTPException(status_code=403, detail=f"Invalid refresh token: {e}")
 
 
+async def validate_jwt_token(request: Request,response: Response,secret_key: str,algorithm: str):
+    return decode_jwt_token(request,response,secret_key,algorithm)
+
+
 def use_jwt(secret_key: str,algorithm:str="HS256"):
     
     def decorator(route_handler:Callable)->Callable:
         
-        @functools.wraps(route_handler)
-        async def wrapper(*args, **kwargs):
+        def authenticate(args, kwargs):
             request:Optional[Request]=None
             response: Optional[Response] = None
             
@@ -138,11 +142,8 @@ def use_jwt(secret_key: str,algorithm:str="HS256"):
             if not request or not response:
                 raise JWTTokenError("Request or Response object not found in route handler parameters.")
 
-            request.state.user=await validate_jwt_token(request,response,secret_key,algorithm)
-            
-            return await route_handler(*args, **kwargs)
+            request.state.user=decode_jwt_token(request,response,secret_key,algorithm)
         
-        return wrapper
+        return wrap_route_handler(route_handler, before=profiled("use_jwt", authenticate))
     
     return decorator
-
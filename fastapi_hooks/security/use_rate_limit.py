@@ -1,8 +1,10 @@
+import math
 import time
-import functools
 from threading import Lock
-from fastapi import Request, HTTPException
+from fastapi import Request, Response, HTTPException
 from starlette.status import HTTP_429_TOO_MANY_REQUESTS
+from fastapi_hooks.profiling import profiled
+from fastapi_hooks.handlers import wrap_route_handler
 
 rate_limit_store = {}
 rate_limit_lock = Lock()
@@ -10,15 +12,24 @@ rate_limit_lock = Lock()
 def get_time_key(window_seconds: int) -> int:
     return int(time.time() // window_seconds)
 
+def get_rate_limit_headers(limit: int, count: int, expiry: float) -> dict:
+    reset = max(0, math.ceil(expiry - time.time()))
+    return {
+        "RateLimit-Limit": str(limit),
+        "RateLimit-Remaining": str(max(0, limit - count)),
+        "RateLimit-Reset": str(reset),
+    }
+
 def use_rate_limit(limit:int,window_seconds:int):
     def decorator(route_handler):
-        @functools.wraps(route_handler)
-        async def wrapper(*args, **kwargs):
+        def check(args, kwargs):
             request: Request = None
+            response: Response = None
             for arg in list(args) + list(kwargs.values()):
-                if isinstance(arg, Request):
+                if isinstance(arg, Request) and request is None:
                     request = arg
-                    break
+                elif isinstance(arg, Response) and response is None:
+                    response = arg
             if request is None:
                 raise RuntimeError("Request object not found in route dependencies")
             identifier=request.client.host
@@ -26,12 +37,18 @@ def use_rate_limit(limit:int,window_seconds:int):
             key=f"{identifier}:{time_key}"
             
             with rate_limit_lock:
-                count,expiry=rate_limit_store.get(key, (0, time.time() + window_seconds))
+                # The window ends at the next time key boundary, so that is when the quota resets
+                count,expiry=rate_limit_store.get(key, (0, (time_key + 1) * window_seconds))
                 if count>=limit:
-                    raise HTTPException(status_code=HTTP_429_TOO_MANY_REQUESTS,detail="Rate limit exceeded")
-                rate_limit_store[key] = (count + 1, expiry)
-            return await route_handler(*args, **kwargs)
-        
-        return wrapper
+                    headers = get_rate_limit_headers(limit, count, expiry)
+                    headers["Retry-After"] = str(max(1, int(headers["RateLimit-Reset"])))
+                    raise HTTPException(status_code=HTTP_429_TOO_MANY_REQUESTS,detail="Rate limit exceeded",headers=headers)
+                count += 1
+                rate_limit_store[key] = (count, expiry)
+
+            if response is not None:
+                response.headers.update(get_rate_limit_headers(limit, count, expiry))
+
+        return wrap_route_handler(route_handler, before=profiled("use_rate_limit", check))
     
     return decorator
@@ -1,7 +1,8 @@
-from functools import wraps
 from fastapi import Response
 from fastapi.responses import JSONResponse
 from typing import Callable, Optional
+from fastapi_hooks.profiling import profiled
+from fastapi_hooks.handlers import wrap_route_handler
 
 
 DEFAULT_HEADERS = {
@@ -19,11 +20,7 @@ def use_secure_headers(custom_headers: Optional[dict] = None) -> Callable:
     headers = {**DEFAULT_HEADERS, **(custom_headers or {})}
 
     def decorator(route_handler):
-        @wraps(route_handler)
-        async def wrapper(*args, **kwargs) -> Response:
-            
-            result = await route_handler(*args, **kwargs)
-
+        def apply_headers(result, state) -> Response:
             if isinstance(result, Response):
                 response = result
             else:
@@ -35,6 +32,6 @@ def use_secure_headers(custom_headers: Optional[dict] = None) -> Callable:
 
             return response
 
-        return wrapper
+        return wrap_route_handler(route_handler, after=profiled("use_secure_headers", apply_headers))
 
     return decorator